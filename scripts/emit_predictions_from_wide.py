@@ -1,4 +1,7 @@
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pac
 from pathlib import Path
 
 df = pd.read_csv("data/truth_labels.tsv")        # needs variant_id
@@ -6,13 +9,24 @@ wide = pd.read_csv("data/tool_scores_wide.tsv")  # variant_id, SpliceAI, CADD, R
 
 m = df[["variant_id"]].merge(wide, on="variant_id", how="inner")
 
+# Convert once; per tool a single Arrow filter replaces dropna + rename + assign copies
+t = pa.Table.from_pandas(m, preserve_index=False)
+
 outdir = Path("results/predictions"); outdir.mkdir(parents=True, exist_ok=True)
-for col in m.columns:
-    if col in {"variant_id"}: 
+for col in t.column_names:
+    if col in {"variant_id"}:
         continue
-    sub = m[["variant_id", col]].dropna().rename(columns={col: "score"})
-    if sub.empty:
+    filt = t.select(["variant_id", col]).filter(pc.is_valid(t[col]))
+    if filt.num_rows == 0:
         continue
-    sub["tool"] = col
-    sub.to_csv(outdir / f"{col}.tsv", index=False)
+    out = pa.table({
+        "variant_id": filt["variant_id"],
+        "score": filt[col],
+        "tool": pa.repeat(pa.scalar(col), filt.num_rows),
+    })
+    # quoting_style does not apply to the header and WriteOptions(quoting_header=...) needs a
+    # newer pyarrow than the project floor (14), so the plain header is written from the table
+    with open(outdir / f"{col}.tsv", "wb") as fh:
+        fh.write((",".join(out.column_names) + "\n").encode())
+        pac.write_csv(out, fh, write_options=pac.WriteOptions(include_header=False, quoting_style="none"))
 print("Wrote per-tool TSVs to results/predictions/")
@@ -1,20 +1,26 @@
 from __future__ import annotations
 import pandas as pd
+import pyarrow as pa
 from pathlib import Path
+try:
+    from .utils import scan_delimited
+except ImportError:  # imported as a top-level module (src/ on sys.path)
+    from utils import scan_delimited
+
+SCHEMA = pa.schema([('score', pa.float64()), ('tool', pa.string()), ('variant_id', pa.string())])
 
 def load_external_predictions(folder: str) -> pd.DataFrame:
     p = Path(folder)
     if not p.exists():
         return pd.DataFrame(columns=['variant_id','score','tool'])
-    dfs = []
-    for f in p.glob('*.tsv'):
-        dfs.append(pd.read_csv(f, sep='\t'))
-    for f in p.glob('*.csv'):
-        dfs.append(pd.read_csv(f))
-    if not dfs:
+    tables = []
+    for pattern, sep in (('*.tsv', '\t'), ('*.csv', ',')):
+        files = sorted(p.glob(pattern))
+        if files:
+            try:
+                tables.append(scan_delimited(files, SCHEMA, delimiter=sep))
+            except ValueError as e:
+                raise ValueError(f"External prediction missing columns: {e}") from e
+    if not tables:
         return pd.DataFrame(columns=['variant_id','score','tool'])
-    df = pd.concat(dfs, ignore_index=True)
-    needed = {'variant_id','score','tool'}
-    if missing := (needed - set(df.columns)):
-        raise ValueError(f"External prediction missing columns: {missing}")
-    return df[sorted(needed)]
+    return pa.concat_tables(tables).to_pandas()
@@ -1,14 +1,61 @@
 from __future__ import annotations
 import pandas as pd, numpy as np
-from sklearn.metrics import roc_auc_score, average_precision_score, brier_score_loss, precision_recall_curve, roc_curve
-from dataclasses import dataclass
-from typing import Dict, Tuple
+from numba import njit, prange
+from sklearn.metrics import average_precision_score, precision_recall_curve, roc_curve
+from typing import Dict, List, Tuple, Union
+try:
+    from .predictions_base import Predictions
+except ImportError:  # imported as a top-level module (src/ on sys.path)
+    from predictions_base import Predictions
 
-def _safe_auc(y_true, y_score):
-    y = np.array(y_true); s = np.array(y_score)
-    if len(np.unique(y)) < 2:
+def fast_auroc(y_true, y_score) -> float:
+    # Rank-sum (Mann-Whitney U) AUROC: one argsort instead of walking the ROC curve.
+    # Runs of tied scores share their average rank, as in grouped_auroc.
+    y = np.asarray(y_true); s = np.asarray(y_score)
+    if not np.isfinite(s).all():
+        raise ValueError("AUROC scores contain NaN or infinity")
+    pos = y == 1
+    n_pos = int(pos.sum()); n_neg = len(y) - n_pos
+    if n_pos == 0 or n_neg == 0:
         return float('nan')
-    return roc_auc_score(y, s)
+    order = np.argsort(s, kind='mergesort')
+    s_sorted = s[order]
+    starts = np.flatnonzero(np.r_[True, s_sorted[1:] != s_sorted[:-1]])
+    ends = np.append(starts[1:], len(s))
+    ranks = np.repeat((starts + ends + 1) / 2.0, ends - starts)
+    return float((ranks[pos[order]].sum() - n_pos * (n_pos + 1) / 2.0) / (n_pos * n_neg))
+
+def grouped_auroc(y_true, y_score, bounds) -> np.ndarray:
+    # Rank-sum AUROC for several tools in one vectorized pass. Rows of tool k occupy
+    # [bounds[k], bounds[k+1]); one lexsort by (tool, score) and bincounts over runs of
+    # tied scores replace a per-tool Python loop. NaN for tools with a single class.
+    # Non-finite scores raise: sorting would otherwise rank NaN above every score.
+    bounds = np.asarray(bounds); n_tools = len(bounds) - 1
+    if len(y_true) == 0:
+        return np.full(n_tools, np.nan)
+    s = np.asarray(y_score)
+    if not np.isfinite(s).all():
+        raise ValueError("AUROC scores contain NaN or infinity")
+    codes = np.repeat(np.arange(n_tools), np.diff(bounds))
+    order = np.lexsort((s, codes))
+    c = codes[order]; s_sorted = s[order]
+    starts = np.flatnonzero(np.r_[True, (c[1:] != c[:-1]) | (s_sorted[1:] != s_sorted[:-1])])
+    g_code = c[starts]
+    g_pos = np.add.reduceat((np.asarray(y_true)[order] == 1).astype(np.int64), starts)
+    g_neg = np.diff(np.append(starts, len(c))) - g_pos
+    n_pos = np.bincount(g_code, weights=g_pos, minlength=n_tools)
+    n_neg = np.bincount(g_code, weights=g_neg, minlength=n_tools)
+    # negatives scored strictly below each run, counted within its own tool
+    neg_below = np.cumsum(g_neg) - g_neg - (np.cumsum(n_neg) - n_neg)[g_code]
+    num = np.bincount(g_code, weights=g_pos * (neg_below + 0.5 * g_neg), minlength=n_tools)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where((n_pos > 0) & (n_neg > 0), num / (n_pos * n_neg), np.nan)
+
+def brier_score(y_true, y_score) -> float:
+    # Mean squared error of probability scores; one float64 buffer squared in place
+    tmp = np.subtract(y_score, y_true, dtype=np.float64)
+    np.square(tmp, out=tmp)
+    return float(tmp.mean())
 
 def _safe_auprc(y_true, y_score):
     y = np.array(y_true); s = np.array(y_score)
@@ -16,29 +63,157 @@ def _safe_auprc(y_true, y_score):
         return float('nan')
     return average_precision_score(y, s)
 
-def evaluate_predictions(truth: pd.DataFrame, preds: pd.DataFrame) -> pd.DataFrame:
-    # truth: variant_id,label ; preds: variant_id,score,tool
-    merged = preds.merge(truth, on='variant_id', how='inner')
+def _sorted_tie_groups(y_true, y_score):
+    # Labels in ascending score order plus the [start, end) bounds of each run of tied scores.
+    # The sort is done once and shared by all resamples; each resample only
+    # redistributes multiplicities over these positions.
+    y = np.asarray(y_true); s = np.asarray(y_score)
+    order = np.argsort(s, kind='mergesort')
+    s_sorted = s[order]
+    is_pos = (y[order] == 1).astype(np.int8)
+    bounds = np.append(np.flatnonzero(np.r_[True, s_sorted[1:] != s_sorted[:-1]]), len(s))
+    return is_pos, bounds
+
+# Numba's on-disk cache records the defining module name, so only cache when imported
+# under the installed top-level name (main.py); `src.evaluate` compiles in-process.
+_NUMBA_CACHE = __name__ == 'evaluate'
+
+# Explicit signatures: compiled once per environment and reused from the on-disk cache;
+# callers cast to these dtypes so label/score dtypes never trigger a recompile.
+@njit('int64[:](int64, int64)', cache=_NUMBA_CACHE)
+def _resample_counts(n, seed):
+    # Multiplicity of each (sorted) position in one bootstrap resample. Seeding here
+    # keeps results independent of how prange iterations are scheduled across threads.
+    np.random.seed(seed)
+    counts = np.zeros(n, dtype=np.int64)
+    for _ in range(n):
+        counts[np.random.randint(0, n)] += 1
+    return counts
+
+@njit('float64[:](int8[:], int64[:], int64, int64)', parallel=True, cache=_NUMBA_CACHE)
+def _bootstrap_auroc(is_pos, bounds, seed, n_boot):
+    # One resample per prange iteration, scored by walking tie groups upwards
+    n = is_pos.shape[0]
+    out = np.empty(n_boot, dtype=np.float64)
+    for b in prange(n_boot):
+        counts = _resample_counts(n, seed + b)
+        num = 0.0; n_pos = 0.0; n_neg = 0.0
+        for g in range(bounds.shape[0] - 1):
+            p = 0.0; q = 0.0
+            for i in range(bounds[g], bounds[g + 1]):
+                if is_pos[i]:
+                    p += counts[i]
+                else:
+                    q += counts[i]
+            num += p * (n_neg + 0.5 * q)
+            n_pos += p; n_neg += q
+        out[b] = num / (n_pos * n_neg) if n_pos > 0 and n_neg > 0 else np.nan
+    return out
+
+@njit('float64[:](int8[:], int64[:], int64, int64)', parallel=True, cache=_NUMBA_CACHE)
+def _bootstrap_auprc(is_pos, bounds, seed, n_boot):
+    # One resample per prange iteration; thresholds are walked from the highest score
+    # down accumulating TP/FP, AP = sum over thresholds of (recall step) * precision
+    n = is_pos.shape[0]
+    out = np.empty(n_boot, dtype=np.float64)
+    for b in prange(n_boot):
+        counts = _resample_counts(n, seed + b)
+        tp = 0.0; fp = 0.0; num = 0.0
+        for g in range(bounds.shape[0] - 2, -1, -1):
+            p = 0.0; q = 0.0
+            for i in range(bounds[g], bounds[g + 1]):
+                if is_pos[i]:
+                    p += counts[i]
+                else:
+                    q += counts[i]
+            tp += p; fp += q
+            if p > 0:
+                num += p * tp / (tp + fp)
+        out[b] = num / tp if tp > 0 else np.nan
+    return out
+
+def bootstrap_auroc(y_true, y_score, n_boot: int = 1000, seed: int = 42) -> np.ndarray:
+    # Bootstrap AUROC values; NaN where a resample holds a single class
+    is_pos, bounds = _sorted_tie_groups(y_true, y_score)
+    return _bootstrap_auroc(is_pos, bounds.astype(np.int64), np.int64(seed), np.int64(n_boot))
+
+def bootstrap_auprc(y_true, y_score, n_boot: int = 1000, seed: int = 42) -> np.ndarray:
+    # Bootstrap average precision (same step definition as average_precision_score);
+    # NaN where a resample holds no positives
+    is_pos, bounds = _sorted_tie_groups(y_true, y_score)
+    return _bootstrap_auprc(is_pos, bounds.astype(np.int64), np.int64(seed), np.int64(n_boot))
+
+def split_predictions(preds: pd.DataFrame) -> List[Predictions]:
+    # long variant_id,score,tool frame -> one Predictions per tool (in sorted tool order)
+    # integer tool codes; sort once and slice contiguous ranges instead of groupby dispatch
+    codes, tools = pd.factorize(preds['tool'], sort=True)
+    # rows without a tool (code -1) are dropped, as groupby('tool') did
+    order = np.flatnonzero(codes >= 0)
+    order = order[np.argsort(codes[order], kind='stable')]
+    codes = codes[order]
+    sizes = np.bincount(codes, minlength=len(tools))
+    ends = np.cumsum(sizes); starts = ends - sizes
+    variant_ids = preds['variant_id'].to_numpy()[order]
+    scores = preds['score'].to_numpy(dtype=np.float32)[order]
+    return [Predictions(str(tool), variant_ids[s0:e0], scores[s0:e0]) for tool, s0, e0 in zip(tools, starts, ends)]
+
+def align_labels(labels: pd.Series, preds: Predictions) -> Tuple[np.ndarray, np.ndarray]:
+    # labels: label Series indexed by variant_id. Returns (y, score) for the
+    # predicted variants that have a label, i.e. an inner join on variant_id.
+    # The index hashtable is built on first lookup and reused for every tool; a
+    # sorted-merge (searchsorted on a sorted index) was measured ~1.5-3x slower on
+    # string variant_ids, so hash lookup is kept.
+    if not labels.index.is_unique:
+        # repeated truth rows: get_indexer needs a unique index, so join like a merge would
+        m = pd.DataFrame({'variant_id': preds.variant_id, 'score': preds.score}).join(
+            labels.rename('label'), on='variant_id', how='inner')
+        return m['label'].to_numpy(dtype=np.int8), m['score'].to_numpy(dtype=np.float32)
+    pos = labels.index.get_indexer(preds.variant_id)
+    keep = pos >= 0
+    return labels.to_numpy(dtype=np.int8)[pos[keep]], preds.score[keep]
+
+def align_tools(labels: pd.Series, preds: List[Predictions]) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+    # align_labels for every tool, laid out contiguously: (tool names, [start, end) bounds,
+    # labels, scores). Tools without any labelled variant are dropped.
+    tools, ys, ss = [], [], []
+    for p in preds:
+        y, s = align_labels(labels, p)
+        if len(y):
+            tools.append(p.tool); ys.append(y); ss.append(s)
+    bounds = np.cumsum([0] + [len(y) for y in ys])
+    if not tools:
+        return tools, bounds, np.empty(0, dtype=np.int8), np.empty(0, dtype=np.float32)
+    return tools, bounds, np.concatenate(ys), np.concatenate(ss)
+
+def evaluate_predictions(truth: pd.DataFrame, preds: Union[pd.DataFrame, List[Predictions]]) -> pd.DataFrame:
+    # truth: variant_id,label ; preds: variant_id,score,tool frame or one Predictions per tool
+    if isinstance(preds, pd.DataFrame):
+        preds = split_predictions(preds)
+    labels = truth.set_index('variant_id')['label']
+    tools, bounds, labels, scores = align_tools(labels, preds)
+    aurocs = grouped_auroc(labels, scores, bounds)
     out_rows = []
-    for tool, g in merged.groupby('tool'):
-        auroc = _safe_auc(g['label'], g['score'])
-        auprc = _safe_auprc(g['label'], g['score'])
-        try:
-            brier = brier_score_loss(g['label'], g['score'])
-        except Exception:
-            brier = float('nan')
-        out_rows.append({'tool': tool, 'n': len(g), 'auroc': auroc, 'auprc': auprc, 'brier': brier})
+    for k, tool in enumerate(tools):
+        y = labels[bounds[k]:bounds[k + 1]]; s = scores[bounds[k]:bounds[k + 1]]
+        auroc = aurocs[k]
+        auprc = _safe_auprc(y, s)
+        # Brier is only defined for probability-like scores
+        brier = brier_score(y, s) if 0 <= s.min() and s.max() <= 1 else float('nan')
+        out_rows.append({'tool': tool, 'n': len(y), 'auroc': auroc, 'auprc': auprc, 'brier': brier})
     return pd.DataFrame(out_rows).sort_values('auprc', ascending=False)
 
 def reliability_bins(y_true, y_score, n_bins: int = 10):
-    y = np.array(y_true); s = np.array(y_score)
+    y = np.array(y_true, dtype=float); s = np.array(y_score, dtype=float)
     bins = np.linspace(0,1,n_bins+1)
     idx = np.digitize(s, bins) - 1
-    rows = []
-    for b in range(n_bins):
-        mask = idx==b
-        if mask.sum()==0:
-            rows.append({'bin': b, 'mean_score': np.nan, 'empirical_pos': np.nan, 'n': 0})
-            continue
-        rows.append({'bin': b, 'mean_score': float(s[mask].mean()), 'empirical_pos': float(y[mask].mean()), 'n': int(mask.sum())})
-    return pd.DataFrame(rows)
+    # scores of exactly 1.0 fall in the last bin; scores outside [0, 1] are not binned
+    idx[s == 1.0] = n_bins - 1
+    keep = (idx >= 0) & (idx < n_bins)
+    idx = idx[keep]; s = s[keep]; y = y[keep]
+    counts = np.bincount(idx, minlength=n_bins)
+    sum_s = np.bincount(idx, weights=s, minlength=n_bins)
+    sum_y = np.bincount(idx, weights=y, minlength=n_bins)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_score = np.where(counts > 0, sum_s / counts, np.nan)
+        empirical_pos = np.where(counts > 0, sum_y / counts, np.nan)
+    return pd.DataFrame({'bin': np.arange(n_bins), 'mean_score': mean_score, 'empirical_pos': empirical_pos, 'n': counts})
@@ -7,15 +7,39 @@ from dataclasses import dataclass
 from datetime import datetime, UTC
 from glob import glob
 from pathlib import Path
-from typing import Callable, Dict, Iterable, List, Optional
+from typing import Callable, Dict, Iterable, List, Optional, Union
 
 import numpy as np
 import pandas as pd
-from sklearn.metrics import average_precision_score, roc_auc_score
+import pyarrow as pa
+from sklearn.metrics import average_precision_score
 
 # Local utils: expects load_variants_table(path) that returns a DataFrame
 # with columns: chrom, pos, ref, alt, and a computed variant_id
-from utils import load_variants_table  # noqa: F401
+try:  # run as `python -m src.main` (Snakefile) or imported as src.main
+    from .utils import load_variants_table, make_variant_id, markdown_table, scan_delimited  # noqa: F401
+    from .evaluate import (
+        Predictions,
+        align_tools,
+        bootstrap_auprc,
+        bootstrap_auroc,
+        brier_score,
+        fast_auroc,
+        grouped_auroc,
+        split_predictions,
+    )
+except ImportError:  # run as a script / top-level module with src/ on sys.path
+    from utils import load_variants_table, make_variant_id, markdown_table, scan_delimited  # noqa: F401
+    from evaluate import (
+        Predictions,
+        align_tools,
+        bootstrap_auprc,
+        bootstrap_auroc,
+        brier_score,
+        fast_auroc,
+        grouped_auroc,
+        split_predictions,
+    )
 
 
 # ---------------------------
@@ -41,13 +65,13 @@ def ensure_dirs() -> None:
 
 def load_truth_labels(path: Path) -> pd.DataFrame:
     """
-    Load truth labels as a DataFrame with columns: variant_id,label (0/1 int).
+    Load truth labels as a DataFrame with columns: variant_id,label (0/1 int8).
     """
     df = pd.read_csv(path, dtype={"variant_id": str, "label": int})
     # basic sanity
     if not {"variant_id", "label"}.issubset(df.columns):
         raise ValueError("truth_labels.tsv must have columns: variant_id,label")
-    df["label"] = df["label"].astype(int)
+    df["label"] = df["label"].astype(np.int8)
     return df[["variant_id", "label"]]
 
 
@@ -59,47 +83,61 @@ def load_prediction_files(pred_dir: Path) -> List[Path]:
     return sorted(files)
 
 
+PRED_COLUMNS = ["variant_id", "score", "tool"]
+# float32 scores: ample precision for ranking/calibration metrics at half the memory traffic
+PRED_SCHEMA = pa.schema([("variant_id", pa.string()), ("score", pa.float32()), ("tool", pa.string())])
+
+
 def read_predictions(paths: List[Path]) -> pd.DataFrame:
     """
     Read and concat prediction TSVs with columns: variant_id,score,tool.
+    All files are scanned as one Arrow dataset and converted to pandas once.
     """
-    frames = []
-    for p in paths:
-        df = pd.read_csv(p, dtype={"variant_id": str, "score": float, "tool": str})
-        required = {"variant_id", "score", "tool"}
-        if not required.issubset(df.columns):
-            raise ValueError(f"{p} must have columns: variant_id,score,tool")
-        frames.append(df[["variant_id", "score", "tool"]])
-    if frames:
-        return pd.concat(frames, ignore_index=True)
+    if paths:
+        return scan_delimited(paths, PRED_SCHEMA).to_pandas()
     else:
-        return pd.DataFrame(columns=["variant_id", "score", "tool"])
+        return pd.DataFrame(columns=PRED_COLUMNS)
 
 
 # ---------------------------
 # Baseline predictors
 # ---------------------------
 
-def make_random_baseline(variant_ids: pd.Series, seed: int = 42) -> pd.DataFrame:
+def make_random_baseline(variant_ids: pd.Series, seed: int = 42) -> Predictions:
     rng = np.random.RandomState(seed)
     scores = rng.rand(len(variant_ids))
-    return pd.DataFrame({"variant_id": variant_ids, "score": scores, "tool": "random_baseline"})
+    return Predictions("random_baseline", variant_ids.to_numpy(), scores.astype(np.float32))
 
 
-def make_pos_sine_baseline(variant_ids: pd.Series) -> pd.DataFrame:
+def make_pos_sine_baseline(variant_ids: pd.Series) -> Predictions:
     """
     Deterministic 'toy' baseline: score = scaled sine of position index.
     Only uses ordering (acts like a weak positional prior).
     """
     x = np.arange(len(variant_ids))
     s = (np.sin(x / 17.0) + 1.0) / 2.0  # in [0,1]
-    return pd.DataFrame({"variant_id": variant_ids, "score": s, "tool": "pos_sine_baseline"})
+    return Predictions("pos_sine_baseline", variant_ids.to_numpy(), s.astype(np.float32))
 
 
 # ---------------------------
 # Metrics & bootstrap CIs
 # ---------------------------
 
+# Bootstrap CIs are skipped when they would not be informative: fewer than
+# BOOTSTRAP_MIN_N scored variants, or fewer than BOOTSTRAP_MIN_POS positives or negatives.
+BOOTSTRAP_MIN_N = 100
+BOOTSTRAP_MIN_POS = 10
+# Resample budget: n_boot = min(BOOTSTRAP_MAX_REPS, max(BOOTSTRAP_MIN_REPS, BOOTSTRAP_WORK // n)),
+# i.e. the full 1000 resamples up to n = 50k, tapering to 200 from n = 250k.
+BOOTSTRAP_MAX_REPS = 1000
+BOOTSTRAP_MIN_REPS = 200
+BOOTSTRAP_WORK = 50_000_000
+
+
+def bootstrap_reps(n: int) -> int:
+    return min(BOOTSTRAP_MAX_REPS, max(BOOTSTRAP_MIN_REPS, BOOTSTRAP_WORK // max(n, 1)))
+
+
 @dataclass
 class MetricRow:
     tool: str
@@ -114,11 +152,12 @@ class MetricRow:
 
 
 def _safe_auc(y_true: np.ndarray, y_score: np.ndarray) -> float:
-    # AUROC requires both classes present
+    # Scorer handle for bootstrap_ci (dispatched to bootstrap_auroc); point AUROCs in
+    # evaluate_tools come from grouped_auroc. AUROC requires both classes present
     y = np.asarray(y_true)
     if len(np.unique(y)) < 2:
         return float("nan")
-    return roc_auc_score(y_true, y_score)
+    return fast_auroc(y_true, y_score)
 
 
 def _safe_auprc(y_true: np.ndarray, y_score: np.ndarray) -> float:
@@ -126,6 +165,13 @@ def _safe_auprc(y_true: np.ndarray, y_score: np.ndarray) -> float:
     return average_precision_score(y_true, y_score)
 
 
+# Scorers with a batched resampling implementation (sort once, score all resamples together)
+_BATCHED_BOOTSTRAP: Dict[Callable, Callable[..., np.ndarray]] = {
+    _safe_auc: bootstrap_auroc,
+    _safe_auprc: bootstrap_auprc,
+}
+
+
 def bootstrap_ci(
     y_true: np.ndarray,
     y_score: np.ndarray,
@@ -134,50 +180,67 @@ def bootstrap_ci(
     seed: int = 42,
     ci: float = 0.95,
 ) -> (float, float):
-    rng = np.random.RandomState(seed)
-    n = len(y_true)
-    idx = np.arange(n)
-    vals: List[float] = []
-    for _ in range(n_boot):
-        b = rng.choice(idx, size=n, replace=True)
-        val = scorer(y_true[b], y_score[b])
-        if not (isinstance(val, float) or isinstance(val, np.floating)):
-            # some scorers might return arrays; reduce to float if needed
-            val = float(val)
-        vals.append(val)
+    batched = _BATCHED_BOOTSTRAP.get(scorer)
+    if batched is not None:
+        vals = batched(y_true, y_score, n_boot=n_boot, seed=seed)
+    else:
+        rng = np.random.default_rng(seed)
+        n = len(y_true)
+        vals = []
+        for _ in range(n_boot):
+            b = rng.integers(0, n, size=n, dtype=np.int64)
+            val = scorer(y_true[b], y_score[b])
+            if not (isinstance(val, float) or isinstance(val, np.floating)):
+                # some scorers might return arrays; reduce to float if needed
+                val = float(val)
+            vals.append(val)
     alpha = (1.0 - ci) * 100.0 / 2.0
     lo, hi = np.percentile(vals, [alpha, 100 - alpha])
     return float(lo), float(hi)
 
 
-def evaluate_tools(truth: pd.DataFrame, preds: pd.DataFrame, do_bootstrap: bool = True) -> pd.DataFrame:
+def evaluate_tools(
+    truth: pd.DataFrame,
+    preds: Union[pd.DataFrame, List[Predictions]],
+    do_bootstrap: bool = True,
+) -> pd.DataFrame:
     """
-    truth: DataFrame with [variant_id, label]
-    preds: DataFrame with [variant_id, score, tool]
+    truth: DataFrame with [variant_id, label] (optionally already indexed by variant_id)
+    preds: DataFrame with [variant_id, score, tool], or one Predictions per tool
     """
-    # Align
-    merged = preds.merge(truth, on="variant_id", how="inner")
+    if isinstance(preds, pd.DataFrame):
+        preds = split_predictions(preds)
+    # Align each tool against the variant_id index, so its hashtable is built once
+    if truth.index.name != "variant_id":
+        truth = truth.set_index("variant_id", drop=False)
+    tools, bounds, labels, scores = align_tools(truth["label"], preds)
     rows: List[MetricRow] = []
 
-    for tool, sub in merged.groupby("tool", sort=True):
-        y = sub["label"].to_numpy(dtype=int)
-        s = sub["score"].to_numpy(dtype=float)
+    # AUROC for all tools in one vectorized pass
+    aurocs = grouped_auroc(labels, scores, bounds)
+
+    for k, tool in enumerate(tools):
+        y = labels[bounds[k]:bounds[k + 1]]
+        s = scores[bounds[k]:bounds[k + 1]]
 
         # Brier score requires probability-like scores in [0,1]
-        brier = float(np.mean((s - y) ** 2))
+        brier = brier_score(y, s)
 
-        auroc = _safe_auc(y, s)
+        auroc = aurocs[k]
         auprc = _safe_auprc(y, s)
 
         auroc_ci_low = auroc_ci_high = auprc_ci_low = auprc_ci_high = None
-        if do_bootstrap and len(sub) >= 50 and np.isfinite(auroc):  # small sets give unstable CIs
-            auroc_ci_low, auroc_ci_high = bootstrap_ci(y, s, _safe_auc)
-            auprc_ci_low, auprc_ci_high = bootstrap_ci(y, s, _safe_auprc)
+        n_pos = int(y.sum())
+        n_neg = len(y) - n_pos
+        if do_bootstrap and len(y) >= BOOTSTRAP_MIN_N and min(n_pos, n_neg) >= BOOTSTRAP_MIN_POS:
+            n_boot = bootstrap_reps(len(y))
+            auroc_ci_low, auroc_ci_high = bootstrap_ci(y, s, _safe_auc, n_boot=n_boot)
+            auprc_ci_low, auprc_ci_high = bootstrap_ci(y, s, _safe_auprc, n_boot=n_boot)
 
         rows.append(
             MetricRow(
                 tool=tool,
-                n=len(sub),
+                n=len(y),
                 auroc=float(auroc) if np.isfinite(auroc) else float("nan"),
                 auprc=float(auprc),
                 brier=brier,
@@ -228,7 +291,7 @@ def write_report(report_path: Path, metrics_df: pd.DataFrame, n_variants: int) -
             table[c] = table[c].map(lambda x: f"{x:.6f}" if pd.notnull(x) else "")
 
     # Convert to markdown
-    lines.append(table.to_markdown(index=False))
+    lines.append(markdown_table(table))
     lines.append("\n")
 
     # Narrative summary
@@ -247,7 +310,8 @@ def write_report(report_path: Path, metrics_df: pd.DataFrame, n_variants: int) -
         lines.append("## Summary\n")
         lines.append(summary + "\n")
 
-    report_path.write_text("\n".join(lines))
+    with open(report_path, "w", encoding="utf-8", buffering=1 << 20) as fh:
+        fh.write("\n".join(lines))
 
 
 # ---------------------------
@@ -261,8 +325,7 @@ def main() -> None:
     variants = load_variants_table(str(DATA_VARIANTS))
     if "variant_id" not in variants.columns:
         # If your utils doesn't construct it, do it here just in case
-        variants["pos"] = variants["pos"].astype(str)
-        variants["variant_id"] = variants["chrom"].astype(str) + ":" + variants["pos"] + ":" + variants["ref"] + ":" + variants["alt"]
+        variants["variant_id"] = make_variant_id(variants)
 
     # Load truth labels
     truth = load_truth_labels(DATA_TRUTH)
@@ -274,17 +337,16 @@ def main() -> None:
     # If none present, build baselines
     if preds.empty:
         vb = variants["variant_id"]
-        baseline_frames = [
+        predictions = [
             make_random_baseline(vb, seed=42),
             make_pos_sine_baseline(vb),
         ]
-        preds = pd.concat(baseline_frames, ignore_index=True)
-
-    # Drop predictions for variants without labels
-    preds = preds.merge(truth[["variant_id"]], on="variant_id", how="inner")
+    else:
+        predictions = split_predictions(preds)
 
-    # Evaluate
-    metrics_df = evaluate_tools(truth, preds, do_bootstrap=True)
+    # Evaluate (predictions for variants without labels are dropped while aligning)
+    truth_idx = truth.set_index("variant_id", drop=False)
+    metrics_df = evaluate_tools(truth_idx, predictions, do_bootstrap=True)
 
     # Write outputs
     metrics_df.to_csv(OUT_METRICS, sep="\t", index=False)
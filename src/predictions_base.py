@@ -0,0 +1,11 @@
+from __future__ import annotations
+import numpy as np
+from dataclasses import dataclass
+
+@dataclass
+class Predictions:
+    # One tool's scores as parallel arrays; the tool name is held once rather than per row.
+    # Scores are float32 and labels int8 throughout the metrics pipeline.
+    tool: str
+    variant_id: np.ndarray
+    score: np.ndarray
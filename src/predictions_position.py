@@ -1,10 +1,12 @@
 from __future__ import annotations
 import numpy as np, pandas as pd
+try:
+    from .predictions_base import Predictions
+except ImportError:  # imported as a top-level module (src/ on sys.path)
+    from predictions_base import Predictions
 
-def score(variants: pd.DataFrame) -> pd.DataFrame:
+def score(variants: pd.DataFrame) -> Predictions:
     # Toy heuristic: normalized sine of position to simulate a non-trivial signal
     pos = variants['pos'].astype(int).to_numpy()
     s = (np.sin(pos / 1000.0) + 1) / 2.0  # 0..1
-    return pd.DataFrame({'variant_id': variants['variant_id'].values,
-                         'score': s,
-                         'tool': 'pos_sine_baseline'})
+    return Predictions('pos_sine_baseline', variants['variant_id'].to_numpy(), s.astype(np.float32))
@@ -1,9 +1,11 @@
 from __future__ import annotations
 import numpy as np, pandas as pd
+try:
+    from .predictions_base import Predictions
+except ImportError:  # imported as a top-level module (src/ on sys.path)
+    from predictions_base import Predictions
 
-def score(variants: pd.DataFrame, seed: int = 42) -> pd.DataFrame:
+def score(variants: pd.DataFrame, seed: int = 42) -> Predictions:
     rng = np.random.default_rng(seed)
     scores = rng.random(len(variants))
-    return pd.DataFrame({'variant_id': variants['variant_id'].values,
-                         'score': scores,
-                         'tool': 'random_baseline'})
+    return Predictions('random_baseline', variants['variant_id'].to_numpy(), scores.astype(np.float32))
@@ -1,6 +1,10 @@
 from __future__ import annotations
 import json, pandas as pd
 from pathlib import Path
+try:
+    from .utils import markdown_table
+except ImportError:  # imported as a top-level module (src/ on sys.path)
+    from utils import markdown_table
 
 def write_manifest(paths_dict, out_path: str):
     Path(out_path).write_text(json.dumps(paths_dict, indent=2))
@@ -11,7 +15,7 @@ def write_markdown_report(metrics_df: pd.DataFrame, out_path: str):
     lines.append("## Research Metrics (discrimination & scalability)")
     lines.append("")
     if not metrics_df.empty:
-        lines.append(metrics_df[['tool','auroc','auprc']].to_markdown(index=False))
+        lines.append(markdown_table(metrics_df[['tool','auroc','auprc']]))
     else:
         lines.append("_No research metrics computed_")
     lines.append("")
@@ -20,7 +24,7 @@ def write_markdown_report(metrics_df: pd.DataFrame, out_path: str):
     lines.append("")
     if not metrics_df.empty:
         if 'brier' in metrics_df.columns:
-            lines.append(metrics_df[['tool','brier','n']].to_markdown(index=False))
+            lines.append(markdown_table(metrics_df[['tool','brier','n']]))
         else:
             lines.append("_No clinical metrics computed_")
     else:
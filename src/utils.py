@@ -1,8 +1,22 @@
 from __future__ import annotations
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pac
+import pyarrow.dataset as pads
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Iterable
+
+
+def make_variant_id(df: pd.DataFrame) -> pd.Series:
+    """
+    Build 'chrom:pos:ref:alt' identifiers with vectorized string concatenation
+    (no per-row Python calls).
+    """
+    return (
+        df["chrom"].astype(str) + ":" + df["pos"].astype(str) + ":"
+        + df["ref"].astype(str) + ":" + df["alt"].astype(str)
+    )
 
 
 def load_variants_table(path: str | Path) -> pd.DataFrame:
@@ -33,11 +47,30 @@ def load_variants_table(path: str | Path) -> pd.DataFrame:
     df["alt"] = df["alt"].astype(str)
 
     # Construct variant_id
-    df["variant_id"] = df["chrom"] + ":" + df["pos"] + ":" + df["ref"] + ":" + df["alt"]
+    df["variant_id"] = make_variant_id(df)
 
     return df
 
 
+def scan_delimited(paths: Iterable[str | Path], schema: pa.Schema, delimiter: str = ",") -> pa.Table:
+    """
+    Read delimited text files into a single Arrow table with the given schema.
+    - Uses one pyarrow dataset scan: files are parsed on Arrow's thread pool and
+      materialized once; extra columns are ignored.
+    - Raises ValueError naming the first file whose header lacks a schema column.
+    """
+    fmt = pads.CsvFileFormat(
+        parse_options=pac.ParseOptions(delimiter=delimiter),
+        convert_options=pac.ConvertOptions(column_types=dict(zip(schema.names, schema.types))),
+    )
+    ds = pads.dataset([str(p) for p in paths], format=fmt, schema=schema)
+    for frag in ds.get_fragments():
+        # header-only check; the scan itself would silently fill missing columns with nulls
+        if not set(schema.names).issubset(frag.physical_schema.names):
+            raise ValueError(f"{frag.path} must have columns: {','.join(schema.names)}")
+    return ds.to_table()
+
+
 def save_table(df: pd.DataFrame, path: str | Path, sep: str = "\t", index: bool = False) -> None:
     """
     Save a DataFrame to disk as TSV/CSV with UTF-8 encoding.
@@ -46,6 +79,18 @@ def save_table(df: pd.DataFrame, path: str | Path, sep: str = "\t", index: bool
     df.to_csv(path, sep=sep, index=index, encoding="utf-8")
 
 
+def markdown_table(df: pd.DataFrame) -> str:
+    """
+    Render a DataFrame as a GitHub-flavoured Markdown table (header, separator, one line per row).
+    Missing values render as empty cells. Avoids the optional tabulate dependency of to_markdown.
+    """
+    cols = [str(c) for c in df.columns]
+    out = ["| " + " | ".join(cols) + " |", "|" + "|".join(["---"] * len(cols)) + "|"]
+    for row in df.itertuples(index=False, name=None):
+        out.append("| " + " | ".join("" if pd.isna(v) else str(v) for v in row) + " |")
+    return "\n".join(out)
+
+
 def preview_table(df: pd.DataFrame, n: int = 5) -> str:
     """
     Return a small string preview of a DataFrame (head and shape).
@@ -1,8 +1,141 @@
+import numpy as np
 import pandas as pd
-from src.evaluate import evaluate_predictions
+import pyarrow as pa
+import pytest
+import shutil
+from pathlib import Path
+from sklearn.metrics import roc_auc_score, average_precision_score
+from src.evaluate import (Predictions, fast_auroc, evaluate_predictions, grouped_auroc, bootstrap_auroc, bootstrap_auprc, reliability_bins,
+                          _resample_counts, _sorted_tie_groups)
+from src.aggregate import load_external_predictions
+from src import main
+from src.utils import markdown_table, scan_delimited
 
 def test_metrics_computation():
     truth = pd.DataFrame({'variant_id':['v1','v2','v3','v4'], 'label':[0,0,1,1]})
     preds = pd.DataFrame({'variant_id':['v1','v2','v3','v4'], 'score':[0.1,0.2,0.8,0.9], 'tool':'x'})
     m = evaluate_predictions(truth, preds)
     assert m['auroc'].iloc[0] > 0.9
+
+def test_metrics_from_predictions_list():
+    truth = pd.DataFrame({'variant_id':['v1','v2','v3','v4'], 'label':[0,0,1,1]})
+    preds = [Predictions('x', np.array(['v4','v1','v9','v3','v2']), np.array([0.9,0.1,0.5,0.8,0.2])),
+             Predictions('y', np.array(['v1','v2','v3','v4']), np.array([0.9,0.8,0.2,0.1]))]
+    m = evaluate_predictions(truth, preds).set_index('tool')
+    assert m.loc['x', 'n'] == 4  # unlabelled v9 is dropped
+    assert m.loc['x', 'auroc'] == 1.0
+    assert m.loc['y', 'auroc'] == 0.0
+
+def test_bootstrap_matches_resampled_sklearn():
+    rng = np.random.default_rng(0)
+    y = rng.integers(0, 2, 80); s = np.round(rng.random(80), 1).astype(np.float32)
+    is_pos, _ = _sorted_tie_groups(y, s)
+    s_sorted = np.sort(s, kind='mergesort')
+    auroc = bootstrap_auroc(y, s, n_boot=5, seed=7)
+    auprc = bootstrap_auprc(y, s, n_boot=5, seed=7)
+    for b in range(5):
+        c = _resample_counts(len(y), 7 + b)
+        yb, sb = np.repeat(is_pos, c), np.repeat(s_sorted, c)
+        assert np.isclose(auroc[b], roc_auc_score(yb, sb))
+        assert np.isclose(auprc[b], average_precision_score(yb, sb))
+
+def test_grouped_auroc_matches_per_tool():
+    rng = np.random.default_rng(1)
+    y = rng.integers(0, 2, 150); s = np.round(rng.random(150), 1)
+    y[100:] = 1  # third tool has a single class
+    bounds = np.array([0, 40, 100, 150])
+    got = grouped_auroc(y, s, bounds)
+    for k in range(2):
+        assert np.isclose(got[k], roc_auc_score(y[bounds[k]:bounds[k + 1]], s[bounds[k]:bounds[k + 1]]))
+    assert np.isnan(got[2])
+
+def test_metrics_with_repeated_truth_row():
+    truth = pd.DataFrame({'variant_id':['v1','v2','v3','v4','v4'], 'label':[0,0,1,1,1]})
+    preds = pd.DataFrame({'variant_id':['v1','v2','v3','v4'], 'score':[0.1,0.2,0.8,0.9], 'tool':'x'})
+    m = evaluate_predictions(truth, preds)
+    assert m['n'].iloc[0] == len(preds.merge(truth, on='variant_id'))
+    assert m['auroc'].iloc[0] == 1.0
+
+def test_rows_without_tool_are_dropped():
+    truth = pd.DataFrame({'variant_id':['v1','v2','v3','v4'], 'label':[0,0,1,1]})
+    preds = pd.DataFrame({'variant_id':['v1','v2','v3','v4','v1'], 'score':[0.1,0.2,0.8,0.9,0.7],
+                          'tool':['x','x','x','x',None]})
+    m = evaluate_predictions(truth, preds)
+    assert list(m['tool']) == ['x']
+    assert m['n'].iloc[0] == 4
+
+def test_reliability_bins_edges():
+    r = reliability_bins([0, 1, 1, 0, 1], [0.05, 1.0, 0.95, -0.5, 7.0], n_bins=10)
+    assert r['n'].sum() == 3  # out-of-range scores are not binned
+    assert r.loc[9, 'n'] == 2 and r.loc[9, 'mean_score'] == 0.975
+    assert r.loc[0, 'n'] == 1 and r.loc[0, 'mean_score'] == 0.05
+    assert np.isnan(r.loc[5, 'mean_score'])
+
+def test_scan_delimited_names_file_missing_column(tmp_path):
+    schema = pa.schema([('variant_id', pa.string()), ('score', pa.float32()), ('tool', pa.string())])
+    good = tmp_path / 'good.tsv'; good.write_text('variant_id,score,tool\nv1,0.5,x\n')
+    bad = tmp_path / 'bad.tsv'; bad.write_text('variant_id,score\nv2,0.7\n')
+    assert scan_delimited([good], schema).num_rows == 1
+    with pytest.raises(ValueError, match='bad.tsv'):
+        scan_delimited([good, bad], schema)
+
+def test_baseline_scorers_return_predictions():
+    import src.predictions_random as pr, src.predictions_position as pp
+    variants = pd.DataFrame({'variant_id': ['1:10:A:G', '1:20:C:T', '2:5:G:A'], 'pos': ['10', '20', '5']})
+    for p, tool in [(pr.score(variants), 'random_baseline'), (pp.score(variants), 'pos_sine_baseline')]:
+        assert isinstance(p, Predictions) and p.tool == tool
+        assert list(p.variant_id) == list(variants['variant_id'])
+        assert p.score.dtype == np.float32 and ((p.score >= 0) & (p.score <= 1)).all()
+
+def test_markdown_table():
+    import src.report  # noqa: F401  (must import without src/ on sys.path)
+    df = pd.DataFrame({'tool': ['a', 'b'], 'n': [3, 10], 'auroc': ['0.500000', None], 'brier': [0.25, np.nan]})
+    assert markdown_table(df).splitlines() == [
+        '| tool | n | auroc | brier |',
+        '|---|---|---|---|',
+        '| a | 3 | 0.500000 | 0.25 |',
+        '| b | 10 |  |  |',
+    ]
+
+def test_load_external_predictions(tmp_path):
+    sample = Path(__file__).resolve().parents[1] / 'predictions' / 'external' / 'spliceai_sample.csv'
+    shutil.copy(sample, tmp_path / 'spliceai_sample.csv')
+    (tmp_path / 'cadd.tsv').write_text('variant_id\ttool\tscore\textra\n1:13116:G:A\tCADD\t0.3\tx\n')
+    df = load_external_predictions(str(tmp_path))
+    assert list(df.columns) == ['score', 'tool', 'variant_id']
+    assert df['score'].dtype == np.float64
+    assert pd.api.types.is_string_dtype(df['tool']) and pd.api.types.is_string_dtype(df['variant_id'])
+    assert len(df) == len(pd.read_csv(sample)) + 1
+    assert df['tool'].value_counts()['CADD'] == 1
+    assert list(load_external_predictions(str(sample.parent)).columns) == ['score', 'tool', 'variant_id']
+
+def test_fast_auroc_matches_sklearn():
+    rng = np.random.default_rng(3)
+    y = rng.integers(0, 2, 300)
+    for s in (rng.random(300), np.round(rng.random(300), 1)):  # distinct scores, heavy ties
+        assert np.isclose(fast_auroc(y, s), roc_auc_score(y, s))
+    assert np.isnan(fast_auroc(np.ones(5), rng.random(5)))
+
+def test_auroc_rejects_non_finite_scores():
+    for s in ([0.1, np.nan, 0.3, 0.4], [0.1, np.inf, 0.3, 0.4]):
+        with pytest.raises(ValueError):
+            grouped_auroc([0, 1, 0, 1], s, [0, 4])
+        with pytest.raises(ValueError):
+            fast_auroc([0, 1, 0, 1], s)
+
+def test_bootstrap_reps_and_skip_thresholds():
+    assert main.bootstrap_reps(main.BOOTSTRAP_MIN_N) == main.BOOTSTRAP_MAX_REPS == 1000
+    assert main.bootstrap_reps(50_000) == 1000
+    assert main.bootstrap_reps(100_000) == 500
+    assert main.bootstrap_reps(10_000_000) == main.BOOTSTRAP_MIN_REPS
+    rng = np.random.default_rng(0)
+    def tool(name, n, n_pos):
+        y = np.r_[np.ones(n_pos, dtype=np.int8), np.zeros(n - n_pos, dtype=np.int8)]
+        ids = np.array([f'{name}{i}' for i in range(n)])
+        return pd.DataFrame({'variant_id': ids, 'label': y}), Predictions(name, ids, rng.random(n).astype(np.float32))
+    cases = [tool('small', 99, 50), tool('few_pos', 100, 9), tool('few_neg', 100, 91), tool('ok', 120, 20)]
+    truth = pd.concat([c[0] for c in cases], ignore_index=True)
+    m = main.evaluate_tools(truth, [c[1] for c in cases]).set_index('tool')
+    for name in ('small', 'few_pos', 'few_neg'):
+        assert m.loc[name, 'auroc_ci_low'] is None or pd.isna(m.loc[name, 'auroc_ci_low'])
+    assert m.loc['ok', 'auroc_ci_low'] <= m.loc['ok', 'auroc'] <= m.loc['ok', 'auroc_ci_high']